@@ -0,0 +1,101 @@
+import os
+import re
+import sys
+import time
+import zipfile
+import tempfile
+import tracemalloc
+from openpyxl import load_workbook, Workbook
+
+from data_processor import leer_excel_pandas, clean_numeric, EXCEL_PATH
+from excel_streaming import leer_excel_streaming, normalizar_columna, COLUMNAS_NUMERICAS_PROCESADOR, COLUMNAS_CRUDAS_PROCESADOR
+
+# Usage (from app/): python scripts/benchmark_lectura.py [repeticiones]
+# Builds a synthetic "multi-year export" by repeating the data rows of the
+# real workbook, then compares peak Python memory and time of both readers.
+# Before measuring, it checks that both readers return the same shape, also on a
+# copy whose <dimension> tag is stale (as in some Google Sheets exports).
+REPETICIONES_DEFAULT = 200
+
+
+def generar_excel_grande(origen, destino, repeticiones):
+    wb_origen = load_workbook(origen, read_only=True, data_only=True)
+    filas = list(wb_origen.worksheets[0].iter_rows(values_only=True))
+    wb_origen.close()
+
+    header, datos = filas[0], [f for f in filas[1:] if any(v is not None for v in f)]
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Hoja 3')
+    ws.append(header)
+    for _ in range(repeticiones):
+        for fila in datos:
+            ws.append(fila)
+    wb.save(destino)
+    return len(datos) * repeticiones
+
+
+def falsear_dimension(origen, destino, ref='A1:B5'):
+    """Copies the workbook with a stale <dimension ref> on every sheet."""
+    with zipfile.ZipFile(origen) as zin, zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if re.fullmatch(r'xl/worksheets/sheet\d+\.xml', item.filename):
+                tag = f'<dimension ref="{ref}"/>'.encode()
+                if b'<dimension ' in data:
+                    data = re.sub(rb'<dimension [^>]*/>', tag, data)
+                else:
+                    # Google Sheets exports omit the tag; it goes before sheetViews/sheetFormatPr/cols/sheetData
+                    data = re.sub(rb'(<(?:sheetViews|sheetFormatPr|cols|sheetData)[ >/])', tag + rb'\1', data, count=1)
+            zout.writestr(item, data)
+
+
+def verificar_modos(ruta):
+    """Both readers must see the same rows and columns (every column requested in streaming)."""
+    df_pandas = leer_excel_pandas(ruta)
+    columnas = [normalizar_columna(c) for c in df_pandas.columns if not str(c).startswith('Unnamed')]
+    df_streaming = leer_excel_streaming(ruta, columnas)
+    forma_pandas = (len(df_pandas), len(columnas))
+    if forma_pandas != df_streaming.shape:
+        raise SystemExit(f"Shape mismatch on {os.path.basename(ruta)}: "
+                         f"pandas {forma_pandas} vs streaming {df_streaming.shape}")
+    print(f"  Same shape in both modes on {os.path.basename(ruta)}: {forma_pandas}")
+
+
+def medir(nombre, lector):
+    # Time and memory come from separate runs: tracemalloc slows allocation-heavy code a lot
+    inicio = time.perf_counter()
+    lector()
+    duracion = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    df = lector()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {nombre:<10} rows={len(df):>8}  cols={len(df.columns):>3}  "
+          f"peak={pico / 1024 / 1024:>8.1f} MiB  time={duracion:>6.2f}s")
+    return pico
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.dirname(script_dir)
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else REPETICIONES_DEFAULT
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, 'benchmark.xlsx')
+        total = generar_excel_grande(os.path.join(app_dir, EXCEL_PATH), ruta, repeticiones)
+        print(f"Synthetic workbook: {total} rows ({os.path.getsize(ruta) / 1024 / 1024:.1f} MiB on disk)")
+
+        ruta_vieja = os.path.join(tmp, 'dimension_vieja.xlsx')
+        falsear_dimension(os.path.join(app_dir, EXCEL_PATH), ruta_vieja)
+        verificar_modos(ruta_vieja)
+        verificar_modos(ruta)
+
+
+        pico_pandas = medir('pandas', lambda: leer_excel_pandas(ruta))
+        pico_streaming = medir('streaming', lambda: leer_excel_streaming(
+            ruta, COLUMNAS_CRUDAS_PROCESADOR,
+            columnas_numericas=COLUMNAS_NUMERICAS_PROCESADOR,
+            convertir_numerico=clean_numeric))
+
+    print(f"Peak memory ratio pandas/streaming: {pico_pandas / max(pico_streaming, 1):.1f}x")
@@ -3,6 +3,9 @@ import numpy as np
 import json
 import os
 import math
+import sys
+from excel_streaming import leer_excel_streaming, COLUMNAS_NUMERICAS_PROCESADOR, COLUMNAS_CRUDAS_PROCESADOR
+from snapshot_store import guardar_snapshot, SNAPSHOT_DIR
 
 # --- CONFIGURATION ---
 EXCEL_PATH = 'data/resultados_unificado.xlsx'
@@ -144,8 +147,7 @@ def build_contract_audit(row):
     }
 
 
-def procesar_datos_dashboard(ruta_archivo):
-    print(f"Reading {ruta_archivo}...")
+def leer_excel_pandas(ruta_archivo):
     xf = pd.ExcelFile(ruta_archivo)
     
     # Auto-detect which sheet has the salon data
@@ -161,9 +163,27 @@ def procesar_datos_dashboard(ruta_archivo):
         except Exception:
             pass
     
-    df = pd.read_excel(ruta_archivo, sheet_name=target_sheet)
+    return pd.read_excel(ruta_archivo, sheet_name=target_sheet)
+
+
+def procesar_datos_dashboard(ruta_archivo, modo_lectura='pandas', snapshot_dir=None):
+    """
+    modo_lectura:
+      - 'pandas': full pd.read_excel of the data sheet (default).
+      - 'streaming': openpyxl read_only rows, projecting only the columns used below.
+        Peak memory stays close to the size of those columns instead of the whole workbook.
+    snapshot_dir: if set, the output is also appended as a new version to the snapshot store there.
+    """
+    print(f"Reading {ruta_archivo} ({modo_lectura})...")
+    if modo_lectura == 'streaming':
+        df = leer_excel_streaming(ruta_archivo, COLUMNAS_CRUDAS_PROCESADOR,
+                                  columnas_numericas=COLUMNAS_NUMERICAS_PROCESADOR,
+                                  convertir_numerico=clean_numeric)
+    elif modo_lectura == 'pandas':
+        df = leer_excel_pandas(ruta_archivo)
+    else:
+        raise ValueError(f"Unknown modo_lectura: {modo_lectura}")
 
-    
     # Normalize column names
     df.columns = [str(c).strip().lower().replace(' ', '_') for c in df.columns]
     
@@ -456,8 +476,14 @@ def procesar_datos_dashboard(ruta_archivo):
         salones.append(salon)
     
     print(f"Writing {len(salones)} records to {OUTPUT_JSON}...")
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
+    # Write to a temp file and swap it in, so readers (query_service.py) never see a partial file
+    tmp_path = OUTPUT_JSON + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(salones, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, OUTPUT_JSON)
+
+    if snapshot_dir:
+        guardar_snapshot(salones, snapshot_dir)
     
     print("Data processing complete!")
 
@@ -468,7 +494,11 @@ if __name__ == "__main__":
     abs_path = os.path.join(app_dir, EXCEL_PATH)
     OUTPUT_JSON = os.path.join(app_dir, OUTPUT_JSON)
 
+    modo_lectura = 'streaming' if '--streaming' in sys.argv else 'pandas'
+    # Only the refresh workflow stores snapshots: local refreshes would create conflicting versions
+    snapshot_dir = os.path.join(app_dir, SNAPSHOT_DIR) if '--snapshot' in sys.argv else None
+
     if os.path.exists(abs_path):
-        procesar_datos_dashboard(abs_path)
+        procesar_datos_dashboard(abs_path, modo_lectura, snapshot_dir)
     else:
         print(f"Error: {EXCEL_PATH} not found at {abs_path}.")
@@ -0,0 +1,156 @@
+import pandas as pd
+import numpy as np
+import math
+from array import array
+from openpyxl import load_workbook
+
+# Columns the dashboard processor actually reads from the Excel.
+# Everything else in the workbook is skipped while streaming.
+COLUMNAS_NUMERICAS_PROCESADOR = ['cantidad_eventos_salon', 'total_invitados_salon', 'costos_variables_salon',
+                                 'costos_fijos_salon', 'ventas_totales_salon', 'mt2_salon', 'pax_calculado',
+                                 'meses_activos', 'meses_activo', 'mediana_benchmarking_mt', 'mt2_mercado',
+                                 'precio_alquiler', 'alquiler_contrato']
+# Kept as raw cell values: identifiers, location, contract/tier labels, and the
+# calculated columns, which the processor keeps from the Excel for rows it does not recompute
+COLUMNAS_CRUDAS_PROCESADOR = ['id_salon', 'nombre_salon', 'año', 'estado_salon',
+                              'direccion_salon', 'cp_salon', 'municipio_salon', 'lat_salon', 'lon_salon',
+                              'estado_contrato', 'tier_salon',
+                              'venta_x_evento_promedio_anual', 'venta_promedio_invitado_anual',
+                              'venta_mensual_promedio_meses_activo', 'retorno_sobre_alquiler',
+                              'incidencia_alquiler_sobre_facturacion_anual', 'margen_individual',
+                              'participacion_margen', 'costos_totales_salon', 'rentabilidad_salon', 'ip_score',
+                              'precio_mt2', 'semaforo_benchmarking', 'precio_pax', 'precio_mt2_ef', 'med_pax',
+                              'med_mt2', 'desvio_indice_pax', 'desvio_indice_mt2',
+                              'indice_global_desviacion_mediana', 'semaforo_performance', 'semaforo_eficiencia']
+
+
+def normalizar_columna(nombre):
+    """Same header normalization used by the processor after pd.read_excel."""
+    return str(nombre).strip().lower().replace(' ', '_')
+
+
+def _detectar_hoja(wb):
+    # Mirrors the processor's auto-detection: first sheet whose header has id_salon or nombre_salon
+    for ws in wb.worksheets:
+        # The stored <dimension> tag can be stale (Google Sheets exports): without this,
+        # read_only iter_rows stops at the stale bounds and silently drops rows/columns
+        ws.reset_dimensions()
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), None)
+        if header is None:
+            continue
+        cols = {normalizar_columna(c) for c in header if c is not None}
+        if 'nombre_salon' in cols or 'id_salon' in cols:
+            print(f"  Found data on sheet '{ws.title}'")
+            return ws
+    return wb.worksheets[0]
+
+
+def _a_float(val):
+    if val is None:
+        return 0.0
+    if isinstance(val, (int, float)):
+        res = float(val)
+        return res if math.isfinite(res) else 0.0
+    return 0.0
+
+
+def leer_excel_streaming(ruta_archivo, columnas, columnas_numericas=(), convertir_numerico=None, hoja=None):
+    """
+    Reads an .xlsx with openpyxl's read_only row iterator and returns a DataFrame
+    holding only the requested columns.
+
+    - columnas: normalized column names to keep as raw cell values.
+    - columnas_numericas: normalized column names parsed while streaming into array('d') buffers.
+    - convertir_numerico: parser applied to each numeric cell (e.g. clean_numeric); defaults to a plain float cast.
+    - hoja: sheet name or index, or None to auto-detect the salon data sheet.
+
+    Columns missing from the workbook are not emitted, so callers keep their
+    own fallbacks for absent columns. Trailing empty rows are dropped, like pd.read_excel.
+    """
+    convertir = convertir_numerico or _a_float
+    numericas = set(columnas_numericas)
+    pedidas = set(columnas) | numericas
+
+    wb = load_workbook(ruta_archivo, read_only=True, data_only=True)
+    try:
+        if hoja is None:
+            ws = _detectar_hoja(wb)
+        else:
+            ws = wb.worksheets[hoja] if isinstance(hoja, int) else wb[hoja]
+        ws.reset_dimensions()  # same as pandas' openpyxl reader, see _detectar_hoja
+        filas = ws.iter_rows(values_only=True)
+        header = next(filas, None)
+        if header is None:
+            return pd.DataFrame()
+
+        # Project: keep (position, name) only for requested columns present in the header
+        proyeccion = []
+        vistas = set()
+        for pos, nombre in enumerate(header):
+            if nombre is None:
+                continue
+            col = normalizar_columna(nombre)
+            if col in pedidas and col not in vistas:
+                proyeccion.append((pos, col))
+                vistas.add(col)
+
+        buffers = {col: array('d') for _, col in proyeccion}
+        # Raw columns start as float buffers and fall back to a list on the first non-numeric cell
+        solo_enteros = {col: True for _, col in proyeccion}
+        con_vacios = {col: False for _, col in proyeccion}
+        # Names, municipios, tiers repeat on every year of an export: keep one object per distinct string
+        textos = {}
+        vacias_pendientes = 0
+
+        def agregar_crudo(col, val):
+            buf = buffers[col]
+            if isinstance(val, str):
+                val = textos.setdefault(val, val)
+            if type(buf) is list:
+                buf.append(val)
+            elif val is None:
+                buf.append(math.nan)
+                con_vacios[col] = True
+            elif isinstance(val, (int, float)) and not isinstance(val, bool):
+                buf.append(val)
+                # pd.read_excel also reads integral floats (e.g. 2.0) as ints
+                if isinstance(val, float) and not val.is_integer():
+                    solo_enteros[col] = False
+            else:
+                restaurar = int if solo_enteros[col] else float
+                buffers[col] = [None if math.isnan(x) else restaurar(x) for x in buf]
+                buffers[col].append(val)
+
+        for fila in filas:
+            if all(v is None for v in fila):
+                # Hold empty rows back; only keep them if data follows (interior blank rows)
+                vacias_pendientes += 1
+                continue
+            for _ in range(vacias_pendientes):
+                for _, col in proyeccion:
+                    if col in numericas:
+                        buffers[col].append(convertir(None))
+                    else:
+                        agregar_crudo(col, None)
+            vacias_pendientes = 0
+
+            largo = len(fila)
+            for pos, col in proyeccion:
+                val = fila[pos] if pos < largo else None
+                if col in numericas:
+                    buffers[col].append(convertir(val))
+                else:
+                    agregar_crudo(col, val)
+    finally:
+        wb.close()
+
+    return pd.DataFrame({col: _a_serie(buffers[col], col in numericas or not solo_enteros[col] or con_vacios[col])
+                         for _, col in proyeccion})
+
+
+def _a_serie(buf, es_float):
+    # Same dtypes pd.read_excel infers: int64 for complete integer columns, float64 otherwise
+    if type(buf) is list:
+        return pd.Series(buf)
+    valores = np.frombuffer(buf, dtype='float64')
+    return pd.Series(valores if es_float else valores.astype('int64'))
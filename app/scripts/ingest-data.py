@@ -3,12 +3,26 @@ import json
 import os
 import re
 import math
+import sys
 import requests
+from excel_streaming import leer_excel_streaming
 
 # Paths
 EXCEL_PATH = 'data/resultados_unificado.xlsx'
 OUTPUT_JSON = 'src/lib/salones_data.json'
 
+# Columns read by ingest(); streaming mode skips everything else in the workbook
+COLUMNAS_INGEST = ['id_salon', 'nombre_salon', 'año', 'estado_salon', 'direccion_salon', 'cp_salon',
+                   'municipio_salon', 'lat_salon', 'lon_salon', 'pax_calculado', 'mt2_salon',
+                   'cantidad_eventos_salon', 'total_invitados_salon', 'costos_variables_salon',
+                   'costos_fijos_salon', 'costos_totales_salon', 'ventas_totales_salon', 'rentabilidad_salon',
+                   'tier', 'semaforo_tipo_salon', 'incidencia_alquiler_sobre_facturacion_anual',
+                   'retorno_sobre_alquiler', 'participacion_margen', 'semaforo_performance', 'precio_por_mt2',
+                   'mt2_mercado', 'semaforo_benchmarking', 'desvio_salon_vs_mercado', 'precio_pax', 'med_pax',
+                   'indice_global_desviacion_mediana', 'semaforo_eficiencia', 'semaforo_indice_global',
+                   'precio_alquiler', 'meses_activos', 'venta_x_evento_promedio_anual',
+                   'venta_promedio_invitado_anual', 'venta_mensual_promedio_meses_activo']
+
 def load_maps_key():
     # Try looking in .env.local first
     env_path = '.env.local'
@@ -114,9 +128,15 @@ def get_color_from_value(val, metric_type):
             
     return 'gray'
 
-def ingest():
-    print(f"Reading {EXCEL_PATH}...")
-    df = pd.read_excel(EXCEL_PATH)
+def ingest(modo_lectura='pandas'):
+    print(f"Reading {EXCEL_PATH} ({modo_lectura})...")
+    if modo_lectura == 'streaming':
+        # Values stay raw: semaforo_* columns may be labels, clean_numeric runs per field below
+        df = leer_excel_streaming(EXCEL_PATH, COLUMNAS_INGEST, hoja=0)
+    elif modo_lectura == 'pandas':
+        df = pd.read_excel(EXCEL_PATH)
+    else:
+        raise ValueError(f"Unknown modo_lectura: {modo_lectura}")
     
     # Drop empty rows (usually at the end of Excel files)
     df = df.dropna(subset=['nombre_salon'])
@@ -223,13 +243,15 @@ def ingest():
     print("Done!")
 
 if __name__ == "__main__":
+    modo_lectura = 'streaming' if '--streaming' in sys.argv else 'pandas'
+
     if os.path.exists(EXCEL_PATH):
-        ingest()
+        ingest(modo_lectura)
     else:
         # Fallback to absolute path if relative fails
         abs_path = os.path.join(os.getcwd(), 'app', EXCEL_PATH)
         if os.path.exists(abs_path):
              EXCEL_PATH = abs_path
-             ingest()
+             ingest(modo_lectura)
         else:
             print(f"Error: {EXCEL_PATH} not found.")
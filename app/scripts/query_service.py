@@ -0,0 +1,308 @@
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# --- CONFIGURATION ---
+# Usage (from app/): python scripts/query_service.py
+# Serves the processor's output (src/lib/salones_data.json) over local HTTP:
+#   GET /salones?estado=ACTIVO&municipio=pilar&tier=2&color_performance=red
+#               &ip_score_min=40&ip_score_max=80&sort=ip_score&order=desc
+#               &offset=0&limit=20&fields=id_salon,nombre_salon,performance.score
+#   GET /salones/<id_salon>?year=2025&fields=...   (without year: first row of the id, in file order)
+#   GET /health
+DATA_JSON = 'src/lib/salones_data.json'
+HOST = os.environ.get('QUERY_SERVICE_HOST', '127.0.0.1')
+PORT = int(os.environ.get('QUERY_SERVICE_PORT', 8765))
+RELOAD_INTERVAL_S = float(os.environ.get('QUERY_SERVICE_RELOAD_S', 2))
+
+# Semaphore colour of each module (query param → path in the salon record)
+COLORES = {
+    'color_performance': 'performance.color',
+    'color_benchmark': 'benchmark.color',
+    'color_efficiency': 'efficiency.color',
+    'color_contract': 'contractAudit.color',
+}
+
+# Metrics with a sorted index: <metric>_min / <metric>_max range filters and sort=<metric>
+METRICAS_RANGO = {
+    'ip_score': 'performance.score',
+    'rent_incidence': 'performance.rentIncidence',
+    'rentabilidad': 'rentabilidad_salon',
+    'ventas': 'ventas_totales_salon',
+    'benchmark_deviation': 'benchmark.deviation',
+    'efficiency_index': 'efficiency.globalIndex',
+    'desvio_contrato': 'contractAudit.desvioPercent',
+}
+
+# Current index; replaced as a whole on reload so requests never see a half-built one
+_indice = None
+
+
+def get_path(salon, path):
+    val = salon
+    for key in path.split('.'):
+        if not isinstance(val, dict):
+            return None
+        val = val.get(key)
+    return val
+
+
+def construir_indice(salones):
+    """
+    Builds every lookup structure once per loaded file. Rows are referenced by
+    their position in `salones`, so filters are set intersections over positions.
+    """
+    por_id = {}
+    por_tier = {}
+    por_municipio = {}
+    por_estado = {}
+    por_color = {param: {} for param in COLORES}
+    ordenados = {}
+    rangos = {}
+
+    for pos, salon in enumerate(salones):
+        # A multi-year output has one row per year for the same id
+        por_id.setdefault(salon.get('id_salon'), []).append(pos)
+        por_tier.setdefault(salon.get('tier'), set()).add(pos)
+        por_estado.setdefault(str(salon.get('estado_salon') or '').upper(), set()).add(pos)
+        municipio = salon.get('municipio_salon')
+        if municipio:
+            por_municipio.setdefault(municipio.lower(), set()).add(pos)
+        for param, path in COLORES.items():
+            por_color[param].setdefault(get_path(salon, path), set()).add(pos)
+
+    for metrica, path in METRICAS_RANGO.items():
+        # Salons without a value for the metric (e.g. desvioPercent of a non-active contract) are left out
+        pares = sorted((float(v), pos) for pos, v in
+                       ((pos, get_path(s, path)) for pos, s in enumerate(salones))
+                       if isinstance(v, (int, float)))
+        ordenados[metrica] = ([v for v, _ in pares], [pos for _, pos in pares])
+        # position → rank in the sorted index, to sort a filtered subset without walking the whole list
+        rangos[metrica] = {pos: rank for rank, (_, pos) in enumerate(pares)}
+
+    return {
+        'salones': salones,
+        'por_id': por_id,
+        'por_tier': por_tier,
+        'por_municipio': por_municipio,
+        'por_estado': por_estado,
+        'por_color': por_color,
+        'ordenados': ordenados,
+        'rangos': rangos,
+    }
+
+
+def _parse_float(params, nombre):
+    raw = params.get(nombre)
+    if raw is None:
+        return None
+    try:
+        val = float(raw)
+    except ValueError:
+        raise ValueError(f"Invalid number for {nombre}: {raw}")
+    # float() accepts nan/inf; nan would make bisect match every row
+    if not math.isfinite(val):
+        raise ValueError(f"Invalid number for {nombre}: {raw}")
+    return val
+
+
+def _parse_int(params, nombre, default):
+    raw = params.get(nombre)
+    if raw is None:
+        return default
+    try:
+        val = int(raw)
+    except ValueError:
+        raise ValueError(f"Invalid integer for {nombre}: {raw}")
+    if val < 0:
+        raise ValueError(f"{nombre} must be >= 0")
+    return val
+
+
+def filtrar(indice, params):
+    """Returns the matching positions, ordered by `sort` or by file order."""
+    candidatos = []
+
+    estado = params.get('estado')
+    if estado:
+        candidatos.append(indice['por_estado'].get(estado.upper(), set()))
+
+    tier = params.get('tier')
+    if tier:
+        candidatos.append(indice['por_tier'].get(_parse_int(params, 'tier', None), set()))
+
+    municipio = params.get('municipio')
+    if municipio:
+        # Same semantics as /api/salones: case-insensitive substring. Only distinct municipios are scanned.
+        buscado = municipio.lower()
+        encontrados = set()
+        for nombre, posiciones in indice['por_municipio'].items():
+            if buscado in nombre:
+                encontrados |= posiciones
+        candidatos.append(encontrados)
+
+    for param in COLORES:
+        color = params.get(param)
+        if color:
+            candidatos.append(indice['por_color'][param].get(color.lower(), set()))
+
+    for metrica in METRICAS_RANGO:
+        minimo = _parse_float(params, f'{metrica}_min')
+        maximo = _parse_float(params, f'{metrica}_max')
+        if minimo is None and maximo is None:
+            continue
+        valores, posiciones = indice['ordenados'][metrica]
+        desde = bisect_left(valores, minimo) if minimo is not None else 0
+        hasta = bisect_right(valores, maximo) if maximo is not None else len(valores)
+        candidatos.append(set(posiciones[desde:hasta]))
+
+    if candidatos:
+        candidatos.sort(key=len)
+        resultado = set(candidatos[0]).intersection(*candidatos[1:])
+    else:
+        resultado = None  # No filters: every salon
+
+    sort = params.get('sort')
+    if sort:
+        if sort not in indice['ordenados']:
+            raise ValueError(f"Unknown sort metric: {sort}")
+        desc = params.get('order', 'asc').lower() == 'desc'
+        if resultado is None:
+            orden = indice['ordenados'][sort][1]
+            con_valor = orden[::-1] if desc else list(orden)
+            sin_valor = [pos for pos in range(len(indice['salones'])) if pos not in indice['rangos'][sort]]
+        else:
+            rango = indice['rangos'][sort]
+            con_valor = sorted((pos for pos in resultado if pos in rango), key=rango.__getitem__, reverse=desc)
+            sin_valor = sorted(pos for pos in resultado if pos not in rango)
+        # Salons without a value for the sort metric go last, in file order
+        return con_valor + sin_valor
+
+    return list(range(len(indice['salones']))) if resultado is None else sorted(resultado)
+
+
+def proyectar(salon, fields):
+    if not fields:
+        return salon
+    proyectado = {}
+    for path in fields:
+        destino = proyectado
+        keys = path.split('.')
+        for key in keys[:-1]:
+            destino = destino.setdefault(key, {})
+        destino[keys[-1]] = get_path(salon, path)
+    return proyectado
+
+
+def consultar(indice, params):
+    posiciones = filtrar(indice, params)
+    offset = _parse_int(params, 'offset', 0)
+    limit = _parse_int(params, 'limit', None)
+    pagina = posiciones[offset:offset + limit] if limit is not None else posiciones[offset:]
+    fields = [f for f in params.get('fields', '').split(',') if f]
+    return {
+        'total': len(posiciones),
+        'offset': offset,
+        'limit': limit,
+        'items': [proyectar(indice['salones'][pos], fields) for pos in pagina],
+    }
+
+
+def cargar(ruta):
+    global _indice
+    with open(ruta, 'r', encoding='utf-8') as f:
+        # mtime of the file actually opened: a stat after reading could pick up the mtime of
+        # a newer file swapped in meanwhile (os.replace), and that update would never reload
+        mtime = os.fstat(f.fileno()).st_mtime
+        salones = json.load(f)
+    nuevo = construir_indice(salones)
+    nuevo['mtime'] = mtime
+    nuevo['loaded_at'] = time.time()
+    _indice = nuevo
+    print(f"Loaded {len(salones)} salons from {ruta}")
+
+
+def vigilar(ruta):
+    """Reloads the index whenever the processor writes a new output file."""
+    ultimo_error = None
+    while True:
+        time.sleep(RELOAD_INTERVAL_S)
+        try:
+            if os.stat(ruta).st_mtime != _indice['mtime']:
+                cargar(ruta)
+            ultimo_error = None
+        except Exception as e:
+            # Missing, mid-write or malformed file (e.g. no id_salon): keep serving the
+            # previous index and retry on next tick. Never let the watcher thread die.
+            error = f"{type(e).__name__}: {e}"
+            if error != ultimo_error:
+                print(f"Reload skipped: {error}")
+            ultimo_error = error
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    def _responder(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        indice = _indice
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        partes = [p for p in url.path.split('/') if p]
+
+        try:
+            if partes == ['health']:
+                return self._responder(200, {
+                    'salones': len(indice['salones']),
+                    'mtime': indice['mtime'],
+                    'loaded_at': indice['loaded_at'],
+                })
+            if partes == ['salones']:
+                return self._responder(200, consultar(indice, params))
+            if len(partes) == 2 and partes[0] == 'salones':
+                try:
+                    id_salon = int(partes[1])
+                except ValueError:
+                    return self._responder(400, {'error': f"Invalid id: {partes[1]}"})
+                posiciones = indice['por_id'].get(id_salon, [])
+                year = _parse_int(params, 'year', None)
+                if year is not None:
+                    posiciones = [p for p in posiciones if indice['salones'][p].get('year') == year]
+                if not posiciones:
+                    return self._responder(404, {'error': 'Salon not found'})
+                # Same as the bundled-data route (salones.find): first match in file order
+                pos = posiciones[0]
+                fields = [f for f in params.get('fields', '').split(',') if f]
+                return self._responder(200, proyectar(indice['salones'][pos], fields))
+            return self._responder(404, {'error': 'Not found'})
+        except ValueError as e:
+            return self._responder(400, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        # Keep stdout for load/reload messages only
+        pass
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.dirname(script_dir)
+    ruta = os.path.join(app_dir, DATA_JSON)
+
+    if not os.path.exists(ruta):
+        print(f"Error: {DATA_JSON} not found at {ruta}.")
+    else:
+        cargar(ruta)
+        threading.Thread(target=vigilar, args=(ruta,), daemon=True).start()
+        server = ThreadingHTTPServer((HOST, PORT), QueryHandler)
+        print(f"Query service listening on http://{HOST}:{PORT}")
+        server.serve_forever()
@@ -0,0 +1,371 @@
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+# --- CONFIGURATION ---
+# Usage (from app/):
+#   python scripts/snapshot_store.py versions
+#   python scripts/snapshot_store.py show <version>
+#   python scripts/snapshot_store.py history <id_salon> [N] [field,field,...] [year]
+#
+# Layout of the store directory:
+#   manifest.json            one entry per version (timestamp, counts, size of the delta)
+#   head.json                latest version, columnar: one line per flattened field
+#   deltas/v000012.json.gz   reverse delta: field-level changes that turn version 12 back into 11
+#
+# Rows are keyed by "<id_salon>:<year>", so a multi-year output keeps one row per salon and year.
+#
+# Only the head holds a full copy, so storage grows with what changed between refreshes.
+# The head is plain text on purpose: it is rewritten and committed on every refresh, and git
+# can only delta-compress consecutive versions of it if they are not gzip'd. Deltas are
+# write-once, so they stay gzip'd.
+# Recent history reads the head plus one small delta per step back.
+SNAPSHOT_DIR = 'data/snapshots'
+HISTORIAL_CAMPOS_DEFAULT = ['performance.score', 'contractAudit.desvioPercent']
+ID_FIELD = 'id_salon'
+YEAR_FIELD = 'year'
+
+
+def flatten(record, prefix=''):
+    """Nested salon dict → {'performance.score': ..., ...}, keeping key order."""
+    flat = {}
+    for key, val in record.items():
+        path = f'{prefix}{key}'
+        if isinstance(val, dict) and val:
+            flat.update(flatten(val, f'{path}.'))
+        else:
+            flat[path] = val
+    return flat
+
+
+def unflatten(flat):
+    record = {}
+    for path, val in flat.items():
+        destino = record
+        keys = path.split('.')
+        for key in keys[:-1]:
+            destino = destino.setdefault(key, {})
+        destino[keys[-1]] = val
+    return record
+
+
+def clave(salon):
+    """Row key in the store: id_salon alone is not unique across years."""
+    year = salon.get(YEAR_FIELD)
+    if isinstance(year, float) and year.is_integer():
+        year = int(year)
+    return f"{salon[ID_FIELD]}:{year}"
+
+
+def _igual(a, b):
+    # 1 and 1.0 are == in Python but serialize differently; compare types too
+    return type(a) is type(b) and a == b
+
+
+def _escribir_json_gz(ruta, data):
+    tmp = ruta + '.tmp'
+    # mtime=0: same content → same bytes, so git only sees files that really changed
+    with open(tmp, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    os.replace(tmp, ruta)
+
+
+def _escribir_head(ruta, head):
+    # One line per column: a refresh that changes a few values only changes a few lines
+    compacto = lambda v: json.dumps(v, ensure_ascii=False, separators=(',', ':'))
+    lineas = [f'"{k}":{compacto(head[k])}' for k in ('version', 'created_at', 'ids', 'fields', 'missing')]
+    columnas = ',\n'.join(f'{compacto(f)}:{compacto(col)}' for f, col in head['columns'].items())
+    tmp = ruta + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write('{\n' + ',\n'.join(lineas) + ',\n"columns":{\n' + columnas + '\n}}\n')
+    os.replace(tmp, ruta)
+
+
+def _leer_head(directorio):
+    with open(os.path.join(directorio, 'head.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _leer_json_gz(ruta):
+    with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ruta_delta(directorio, version):
+    return os.path.join(directorio, 'deltas', f'v{version:06d}.json.gz')
+
+
+def leer_manifest(directorio):
+    ruta = os.path.join(directorio, 'manifest.json')
+    if not os.path.exists(ruta):
+        return {'versions': []}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _escribir_manifest(directorio, manifest):
+    ruta = os.path.join(directorio, 'manifest.json')
+    tmp = ruta + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, ruta)
+
+
+# --- STATE: {'ids': [row keys], 'fields': [...], 'records': {row key: flat record}} ---
+
+def _estado_desde_salones(salones):
+    records = {}
+    fields = []
+    vistos = set()
+    ids = []
+    for salon in salones:
+        if ID_FIELD not in salon:
+            raise ValueError(f"Salon without {ID_FIELD}: {salon.get('nombre_salon')}")
+        key = clave(salon)
+        if key in records:
+            # Storing it would silently keep only the last row of the key and corrupt history
+            raise ValueError(f"Duplicate salon key {key} ({ID_FIELD}:{YEAR_FIELD})")
+        flat = flatten(salon)
+        records[key] = flat
+        ids.append(key)
+        for field in flat:
+            if field not in vistos:
+                vistos.add(field)
+                fields.append(field)
+    return {'ids': ids, 'fields': fields, 'records': records}
+
+
+def _estado_a_salones(estado):
+    # Patched records may have keys out of order; the snapshot's field order is the reference
+    return [unflatten({f: rec[f] for f in estado['fields'] if f in rec})
+            for rec in (estado['records'][i] for i in estado['ids'])]
+
+
+def _estado_a_columnar(estado):
+    columns = {}
+    missing = {}
+    for field in estado['fields']:
+        col = []
+        for i in estado['ids']:
+            rec = estado['records'][i]
+            if field in rec:
+                col.append(rec[field])
+            else:
+                col.append(None)
+                missing.setdefault(field, []).append(i)
+        columns[field] = col
+    return {'ids': estado['ids'], 'fields': estado['fields'], 'columns': columns, 'missing': missing}
+
+
+def _estado_desde_columnar(head):
+    ids = head['ids']
+    missing = {field: set(ids_) for field, ids_ in head.get('missing', {}).items()}
+    records = {i: {} for i in ids}
+    # Field-major fill keeps each record's keys in the global field order
+    for field in head['fields']:
+        faltan = missing.get(field, ())
+        for i, val in zip(ids, head['columns'][field]):
+            if i not in faltan:
+                records[i][field] = val
+    return {'ids': list(ids), 'fields': list(head['fields']), 'records': records}
+
+
+def calcular_delta_inverso(anterior, nuevo):
+    """
+    Field-level changes that turn `nuevo` back into `anterior`, keyed by row key (id_salon:year).
+    Rows that stay untouched cost nothing.
+    """
+    ids_anteriores = set(anterior['ids'])
+    ids_nuevos = set(nuevo['ids'])
+
+    changed = {}
+    unset = {}
+    for i in nuevo['ids']:
+        if i not in ids_anteriores:
+            continue
+        viejo = anterior['records'][i]
+        actual = nuevo['records'][i]
+        for field, val in viejo.items():
+            if field not in actual or not _igual(actual[field], val):
+                changed.setdefault(field, {})[i] = val
+        for field in actual:
+            if field not in viejo:
+                unset.setdefault(field, []).append(i)
+
+    added = [i for i in nuevo['ids'] if i not in ids_anteriores]
+    dropped = {i: anterior['records'][i] for i in anterior['ids'] if i not in ids_nuevos}
+
+    delta = {'changed': changed, 'unset': unset, 'added': added, 'dropped': dropped}
+    # Row and field order are implied unless they actually moved
+    added_set = set(added)
+    if [i for i in nuevo['ids'] if i not in added_set] != anterior['ids']:
+        delta['ids'] = anterior['ids']
+    if nuevo['fields'] != anterior['fields']:
+        delta['fields'] = anterior['fields']
+    return delta
+
+
+def aplicar_delta_inverso(estado, delta):
+    """Turns the state of version v into v-1 (in place)."""
+    records = estado['records']
+    added = set(delta['added'])
+    for i in added:
+        del records[i]
+    for i, rec in delta['dropped'].items():
+        records[i] = rec
+    for field, valores in delta['changed'].items():
+        for i, val in valores.items():
+            records[i][field] = val
+    for field, ids in delta['unset'].items():
+        for i in ids:
+            records[i].pop(field, None)
+
+    estado['ids'] = delta['ids'] if 'ids' in delta else [i for i in estado['ids'] if i not in added]
+    estado['fields'] = delta.get('fields', estado['fields'])
+    return estado
+
+
+def _delta_vacio(delta):
+    return not (delta['changed'] or delta['unset'] or delta['added'] or delta['dropped']
+                or 'ids' in delta or 'fields' in delta)
+
+
+def guardar_snapshot(salones, directorio, created_at=None):
+    """
+    Appends `salones` (the processor output) as a new version.
+    Returns the version number; a run identical to the latest version is not stored again.
+    """
+    os.makedirs(os.path.join(directorio, 'deltas'), exist_ok=True)
+    manifest = leer_manifest(directorio)
+    created_at = created_at or datetime.now(timezone.utc).isoformat(timespec='seconds')
+    nuevo = _estado_desde_salones(salones)
+    ruta_head = os.path.join(directorio, 'head.json')
+
+    entrada = {'created_at': created_at, 'salones': len(salones)}
+    if manifest['versions']:
+        head = _leer_head(directorio)
+        version_anterior = manifest['versions'][-1]['version']
+        if head['version'] != version_anterior:
+            raise ValueError(f"head.json is version {head['version']}, manifest expects {version_anterior}")
+
+        delta = calcular_delta_inverso(_estado_desde_columnar(head), nuevo)
+        if _delta_vacio(delta):
+            print(f"Snapshot unchanged since version {version_anterior}, nothing stored")
+            return version_anterior
+
+        version = version_anterior + 1
+        _escribir_json_gz(_ruta_delta(directorio, version), dict(delta, version=version))
+        entrada.update({
+            'changed_fields': sum(len(v) for v in delta['changed'].values()),
+            'added': len(delta['added']),
+            'dropped': len(delta['dropped']),
+            'delta_bytes': os.path.getsize(_ruta_delta(directorio, version)),
+        })
+    else:
+        version = 1
+
+    _escribir_head(ruta_head, dict(_estado_a_columnar(nuevo), version=version, created_at=created_at))
+    # Manifest goes last: a version only exists once it is listed here
+    manifest['versions'].append({'version': version, **entrada})
+    _escribir_manifest(directorio, manifest)
+    print(f"Snapshot version {version} stored in {directorio}")
+    return version
+
+
+def cargar_version(directorio, version=None):
+    """Rebuilds the processor output of `version` (default: latest) by walking back from the head."""
+    manifest = leer_manifest(directorio)
+    if not manifest['versions']:
+        raise ValueError(f"No snapshots in {directorio}")
+    ultima = manifest['versions'][-1]['version']
+    version = ultima if version is None else version
+    if not 1 <= version <= ultima:
+        raise ValueError(f"Unknown version {version} (available: 1..{ultima})")
+
+    estado = _estado_desde_columnar(_leer_head(directorio))
+    for v in range(ultima, version, -1):
+        aplicar_delta_inverso(estado, _leer_json_gz(_ruta_delta(directorio, v)))
+    return _estado_a_salones(estado)
+
+
+def historial_salon(directorio, id_salon, campos=None, ultimas=10, year=None):
+    """
+    Values of `campos` for one salon over the last `ultimas` versions, oldest first.
+    Without `year`, every year of the salon is returned (one row per version and year).
+    Reads the head and `ultimas - 1` deltas, looking only at this salon's entries.
+    """
+    if ultimas < 1:
+        raise ValueError(f"ultimas must be >= 1, got {ultimas}")
+    campos = campos or HISTORIAL_CAMPOS_DEFAULT
+    manifest = leer_manifest(directorio)
+    versiones = manifest['versions'][-ultimas:]
+    if not versiones:
+        return []
+
+    def es_del_salon(key):
+        id_key, year_key = key.split(':', 1)
+        return id_key == str(id_salon) and (year is None or year_key == str(year))
+
+    head = _leer_head(directorio)
+    recs = {}
+    for pos, key in enumerate(head['ids']):
+        if es_del_salon(key):
+            faltan = {f for f, ids in head.get('missing', {}).items() if key in ids}
+            recs[key] = {f: head['columns'][f][pos] for f in campos if f in head['columns'] and f not in faltan}
+
+    # Walk back from the head: state of this salon's rows at each version
+    por_version = []
+    for entrada in reversed(versiones):
+        v = entrada['version']
+        por_version.append((entrada, {key: dict(rec) for key, rec in recs.items()}))
+        if v == versiones[0]['version']:
+            break
+
+        # Step back to v-1 for this salon only
+        delta = _leer_json_gz(_ruta_delta(directorio, v))
+        for key in delta['added']:
+            if es_del_salon(key):
+                recs.pop(key, None)
+        for key, rec in delta['dropped'].items():
+            if es_del_salon(key):
+                recs[key] = {f: rec[f] for f in campos if f in rec}
+        for key, rec in recs.items():
+            for f in campos:
+                if key in delta['changed'].get(f, {}):
+                    rec[f] = delta['changed'][f][key]
+                if key in delta['unset'].get(f, ()):
+                    rec.pop(f, None)
+
+    # Rows that appear in any visited version are reported in every version (presente=False when absent)
+    keys = sorted({key for _, recs_v in por_version for key in recs_v})
+    historial = []
+    for entrada, recs_v in reversed(por_version):
+        for key in keys:
+            rec = recs_v.get(key)
+            historial.append({'version': entrada['version'], 'created_at': entrada['created_at'],
+                              'clave': key, 'presente': rec is not None,
+                              **{f: (rec or {}).get(f) for f in campos}})
+    return historial
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    app_dir = os.path.dirname(script_dir)
+    directorio = os.path.join(app_dir, SNAPSHOT_DIR)
+    args = sys.argv[1:]
+
+    if args[:1] == ['versions']:
+        for entrada in leer_manifest(directorio)['versions']:
+            print(json.dumps(entrada, ensure_ascii=False))
+    elif args[:1] == ['show'] and len(args) == 2:
+        print(json.dumps(cargar_version(directorio, int(args[1])), indent=2, ensure_ascii=False))
+    elif args[:1] == ['history'] and len(args) >= 2:
+        ultimas = int(args[2]) if len(args) > 2 else 10
+        campos = args[3].split(',') if len(args) > 3 else None
+        year = int(args[4]) if len(args) > 4 else None
+        for fila in historial_salon(directorio, int(args[1]), campos, ultimas, year):
+            print(json.dumps(fila, ensure_ascii=False))
+    else:
+        print("Usage: snapshot_store.py versions | show <version> | history <id_salon> [N] [fields] [year]")
@@ -1,7 +1,10 @@
 import { NextResponse } from "next/server";
-import { getSalonesData } from "@/lib/sample-data";
+import { getSalonesData, mapRawToSalon } from "@/lib/sample-data";
 import { auth } from "@/auth";
 
+// Optional local query service (scripts/query_service.py): O(1) lookup by id_salon
+const QUERY_SERVICE_URL = process.env.SALONES_QUERY_URL;
+
 export async function GET(
     request: Request,
     { params }: { params: Promise<{ id: string }> }
@@ -14,6 +17,23 @@ export async function GET(
         }
 
         const { id } = await params;
+
+        if (QUERY_SERVICE_URL) {
+            const { searchParams } = new URL(request.url);
+            const res = await fetch(`${QUERY_SERVICE_URL}/salones/${encodeURIComponent(id)}?${searchParams.toString()}`, {
+                cache: "no-store",
+            });
+            if (res.status === 404 || res.status === 400) {
+                return NextResponse.json({ error: "Salon not found" }, { status: 404 });
+            }
+            if (!res.ok) {
+                throw new Error(`Query service returned ${res.status}`);
+            }
+            const salon = await res.json();
+            // Projected responses (fields=...) skip mapRawToSalon, which would add made-up defaults
+            return NextResponse.json(searchParams.has("fields") ? salon : mapRawToSalon(salon));
+        }
+
         const salones = getSalonesData();
         const salon = salones.find((s) => s.id_salon === parseInt(id));
 
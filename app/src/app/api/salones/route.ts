@@ -37,6 +37,35 @@ async function fetchSalonesFromGitHub(): Promise<SalonIntegral[]> {
     return raw.map(mapRawToSalon);
 }
 
+// Optional local query service (scripts/query_service.py): indexed filters, no GitHub fetch
+const QUERY_SERVICE_URL = process.env.SALONES_QUERY_URL;
+
+async function querySalonesFromService(searchParams: URLSearchParams): Promise<NextResponse> {
+    const res = await fetch(`${QUERY_SERVICE_URL}/salones?${searchParams.toString()}`, {
+        cache: "no-store",
+    });
+
+    // Invalid filters (e.g. tier=abc) are the caller's error: forward status and body unchanged
+    if (res.status >= 400 && res.status < 500) {
+        return NextResponse.json(await res.json(), { status: res.status });
+    }
+    if (!res.ok) {
+        throw new Error(`Query service returned ${res.status}`);
+    }
+
+    const { total, offset, limit, items } = await res.json();
+    // Projected responses (fields=...) are returned as-is: mapRawToSalon would fill the
+    // keys that were not requested with derived defaults (ip_score: 0, categoria_ip: "gray"...)
+    const salones = searchParams.has("fields") ? items : items.map(mapRawToSalon);
+    const headers = { "X-Total-Count": String(total) };
+
+    // Paginated requests get the page metadata; unpaginated ones keep the plain array shape
+    if (searchParams.has("offset") || searchParams.has("limit")) {
+        return NextResponse.json({ total, offset, limit, items: salones }, { headers });
+    }
+    return NextResponse.json(salones, { headers });
+}
+
 async function getSalones(): Promise<SalonIntegral[]> {
     const cached = cache.get(CACHE_KEY);
     const now = Date.now();
@@ -60,6 +89,12 @@ export async function GET(request: Request) {
         }
 
         const { searchParams } = new URL(request.url);
+
+        // Query service filters (estado, municipio, tier, colors, metric ranges) and paginates itself
+        if (QUERY_SERVICE_URL) {
+            return await querySalonesFromService(searchParams);
+        }
+
         const estado = searchParams.get("estado");
         const municipio = searchParams.get("municipio");
         const tier = searchParams.get("tier");